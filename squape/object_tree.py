@@ -4,9 +4,8 @@
 # All rights reserved.
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
-import math
+import sys
 import time
-import types
 
 try:
     import squish
@@ -18,6 +17,13 @@ from squape.settings import objectNotFoundDebugging
 from squape.report import debug
 
 
+class _Missing:
+    """Marks a property missing on an object, as None can be a valid value."""
+
+
+_MISSING = _Missing()
+
+
 def children(object_or_name: any, selector: dict) -> tuple:
     """
     Finds direct children of the given object.
@@ -56,7 +62,7 @@ def children(object_or_name: any, selector: dict) -> tuple:
     """
     object_reference = _get_object_reference(object_or_name)
     children = object.children(object_reference)
-    return tuple(filter(lambda x: _is_matching(x, selector), children))
+    return tuple(filter(_compile_selector(selector), children))
 
 
 def find(object_or_name: any, selector: dict = None, max_depth: int = None) -> tuple:
@@ -101,22 +107,77 @@ def find(object_or_name: any, selector: dict = None, max_depth: int = None) -> t
         )
         ```
     """
-    if max_depth is None:
-        max_depth = math.inf
-    if max_depth <= 0:
+    if max_depth is not None and max_depth <= 0:
         return ()
-    if selector is None:
-        selector = {}
 
+    is_matching = _compile_selector(selector)
     object_reference = _get_object_reference(object_or_name)
-    children = ()
 
-    for child in object.children(object_reference):
-        if _is_matching(child, selector):
-            children += (child,)
-        children += find(child, selector, max_depth - 1)
+    if max_depth is None:
+        return _find_all(object_reference, is_matching)
+    return _find_bounded(object_reference, is_matching, max_depth)
+
+
+def _find_all(object_reference: any, is_matching) -> tuple:
+    """
+    Finds all descendants of the given object that match the predicate.
 
-    return children
+    Depth-first traversal with an explicit stack keeps the pre-order
+    of the results without recursion. Children are pushed in reverse order,
+    so the first child is visited first.
+
+    Args:
+        object_reference (any): object reference.
+        is_matching (callable): predicate compiled from the selector.
+
+    Returns:
+        Descendants of the given object that match the predicate.
+    """
+    get_children = object.children
+    descendants = []
+    stack = list(reversed(get_children(object_reference)))
+    # Bound methods are looked up once, not on every visited object
+    add_descendant = descendants.append
+    pop = stack.pop
+    push = stack.extend
+    while stack:
+        child = pop()
+        if is_matching(child):
+            add_descendant(child)
+        push(reversed(get_children(child)))
+
+    return tuple(descendants)
+
+
+def _find_bounded(object_reference: any, is_matching, max_depth: int) -> tuple:
+    """
+    Finds descendants of the given object, up to the given depth,
+    that match the predicate.
+
+    Works like _find_all, but tracks the depth of every visited object
+    and does not look for children below max_depth.
+
+    Args:
+        object_reference (any): object reference.
+        is_matching (callable): predicate compiled from the selector.
+        max_depth (int): maximum depth of the search, at least 1.
+
+    Returns:
+        Descendants of the given object that match the predicate.
+    """
+    descendants = []
+    stack = [(child, 1) for child in reversed(object.children(object_reference))]
+    while stack:
+        child, depth = stack.pop()
+        if is_matching(child):
+            descendants.append(child)
+        if depth < max_depth:
+            stack.extend(
+                (grandchild, depth + 1)
+                for grandchild in reversed(object.children(child))
+            )
+
+    return tuple(descendants)
 
 
 def find_ancestor(object_or_name: any, selector: dict):
@@ -153,16 +214,16 @@ def find_ancestor(object_or_name: any, selector: dict):
         )
         ```
     """
+    is_matching = _compile_selector(selector)
     object_reference = _get_object_reference(object_or_name)
     parent = object.parent(object_reference)
 
-    if parent is None:
-        return None
-
-    if _is_matching(object.parent(object_reference), selector):
-        return parent
+    while parent is not None:
+        if is_matching(parent):
+            return parent
+        parent = object.parent(parent)
 
-    return find_ancestor(parent, selector)
+    return None
 
 
 def siblings(object_or_name: any, selector: dict = None) -> tuple:
@@ -197,26 +258,30 @@ def siblings(object_or_name: any, selector: dict = None) -> tuple:
         )
         ```
     """
-    if selector is None:
-        selector = {}
     object_reference = _get_object_reference(object_or_name)
     parent = object.parent(object_reference)
 
     if parent is None:
         return None
-    else:
-        siblings = list(object.children(parent))
-        siblings.remove(object_reference)
-        return tuple(filter(lambda x: _is_matching(x, selector), siblings))
+
+    is_matching = _compile_selector(selector)
+    # Squish returns new wrappers for the children, so the given object
+    # has to be skipped by equality rather than identity.
+    return tuple(
+        child
+        for child in object.children(parent)
+        if child != object_reference and is_matching(child)
+    )
 
 
-def _is_matching(object_or_name: any, selector: dict) -> bool:
+def _compile_selector(selector: dict):
     """
-    Checks if the properties of the given object match the provided selector.
+    Compiles the selector into a function checking if an object matches it.
 
-    Args:
-        object_or_name (any): symbolic name, real name, or object reference.
+    The selector is interpreted once, so matching many objects against it
+    does not repeat the same dictionary iteration and value type checks.
 
+    Args:
         selector (dict, optional): The selector is a dictionary of key-value pairs,
             where a key is a property of an object  and value is expected value
             or function. The passed functions must accept exactly one argument.
@@ -226,40 +291,109 @@ def _is_matching(object_or_name: any, selector: dict) -> bool:
             Defaults to {}, which means all objects pass the verification.
 
     Returns:
-        True if the object matches the selector, False otherwise.
+        A function that takes an object reference and returns True
+        if the object matches the selector, False otherwise.
     """
-    if selector == {}:
+    if not selector:
+        return _match_any
+
+    # Cheaper checks run first, so the costly ones are done only for objects
+    # that passed the rest.
+    items = sorted(selector.items(), key=_selector_check_cost)
+    checks = tuple(
+        _compile_selector_check(key, expected_value) for key, expected_value in items
+    )
+    if len(checks) == 1:
+        return checks[0]
+
+    def is_matching(object_reference: any) -> bool:
+        for check in checks:
+            if not check(object_reference):
+                return False
         return True
 
-    object_reference = _get_object_reference(object_or_name)
+    return is_matching
+
+
+def _selector_check_cost(item: tuple) -> int:
+    """
+    Estimates the relative cost of checking a selector's key-value pair.
+
+    Comparing a property with a value is the cheapest check. A user function
+    may do arbitrary work on top of reading the property, and the 'type' check
+    asks Squish for the class name of the object.
+
+    Args:
+        item (tuple): selector's key and expected value.
+
+    Returns:
+        0 for value comparisons, 1 for functions, and 2 for the 'type' check.
+    """
+    key, expected_value = item
+    if key == "type":
+        return 2
+    if callable(expected_value):
+        return 1
+    return 0
+
+
+def _compile_selector_check(key: str, expected_value: any):
+    """
+    Compiles a single key-value pair of a selector into a check function.
+
+    Args:
+        key (str): object's property name or 'type'.
+        expected_value (any): expected value of the property or a function
+            that takes exactly one argument.
 
-    for key, expected_value in selector.items():
-        if key == "type":
-            # Type verification
+    Returns:
+        A function that takes an object reference and returns True
+        if the object passes the check, False otherwise.
+    """
+    # An interned name lets attribute lookups compare the key by identity
+    key = sys.intern(key)
+
+    if key == "type":
+        # Type verification
+        def check(object_reference: any) -> bool:
             actual_type = squish.className(object_reference).rsplit("_QMLTYPE_", 1)[0]
-            if actual_type != expected_value:
-                return False
-        elif not hasattr(object_reference, key):
-            # Object does not have given attribute
-            return False
-        else:
-            # object has given attribute
-            attr = getattr(object_reference, key)
-            if isinstance(expected_value, types.FunctionType):
-                # The expected_value is a lambda function
-                lambda_function = expected_value
-                lambda_result = lambda_function(attr)
-                if not isinstance(lambda_result, bool):
-                    raise RuntimeError(
-                        f"The lambda function assossiated with a key '{key}' \
-                        returned non-boolean result: \
-                        {lambda_result} ({type(lambda_result)})"
-                    )
-                if not lambda_result:
-                    return False
-
-            elif attr != expected_value:
+            return actual_type == expected_value
+
+    elif callable(expected_value):
+        # The expected_value is a lambda function
+        def check(object_reference: any) -> bool:
+            attr = getattr(object_reference, key, _MISSING)
+            if attr is _MISSING:
+                # Object does not have given attribute
                 return False
+            lambda_result = expected_value(attr)
+            if not isinstance(lambda_result, bool):
+                raise RuntimeError(
+                    f"The lambda function assossiated with a key '{key}' \
+                    returned non-boolean result: \
+                    {lambda_result} ({type(lambda_result)})"
+                )
+            return lambda_result
+
+    else:
+
+        def check(object_reference: any) -> bool:
+            attr = getattr(object_reference, key, _MISSING)
+            return attr is not _MISSING and attr == expected_value
+
+    return check
+
+
+def _match_any(object_reference: any) -> bool:
+    """
+    Matches any object, used for empty selectors.
+
+    Args:
+        object_reference (any): object reference.
+
+    Returns:
+        Always True.
+    """
     return True
 
 
@@ -285,10 +419,12 @@ def _wait_for_any_object(
 ):
     if not object_names:
         raise ValueError("Object names list is empty!")
+    if timeout is None:
+        timeout = squish.testSettings.waitForObjectTimeout / 1000
 
-    start_time = time.time()
+    deadline = time.monotonic() + timeout
 
-    while time.time() - start_time < timeout:
+    while time.monotonic() < deadline:
         for obj_name in object_names:
             try:
                 return lookup_function(obj_name, 0)
@@ -296,14 +432,16 @@ def _wait_for_any_object(
             except LookupError as e:
                 debug(f"{e}")
 
-        squish.snooze(retry_delay)
+        remaining = deadline - time.monotonic()
+        if remaining > 0:
+            squish.snooze(min(retry_delay, remaining))
 
     raise LookupError(f"Objects {object_names} not found")
 
 
 def wait_for_any_object(
     object_names: list,
-    timeout=squish.testSettings.waitForObjectTimeout / 1000,
+    timeout: float = None,
     retry_delay: float = 0.5,
 ):
     """
@@ -312,9 +450,10 @@ def wait_for_any_object(
 
     Args:
         object_names (list): A list of names of the objects to wait for.
-        timeout (int, optional): The maximum time in seconds to wait for
+        timeout (float, optional): The maximum time in seconds to wait for
             any object to become available.
-            Defaults to squish.testSettings.waitForObjectTimeout/1000.
+            Defaults to squish.testSettings.waitForObjectTimeout/1000
+            read at the time of the call.
         retry_delay (float, optional): The time in seconds to wait before
         retrying the Squish lookup function. Defaults to 0.5.
 
@@ -333,7 +472,7 @@ def wait_for_any_object(
 
 def wait_for_any_object_exists(
     object_names: list,
-    timeout=squish.testSettings.waitForObjectTimeout / 1000,
+    timeout: float = None,
     retry_delay: float = 0.5,
 ):
     """
@@ -342,9 +481,10 @@ def wait_for_any_object_exists(
 
     Args:
         object_names (list): A list of names of the objects to wait for.
-        timeout (int, optional): The maximum time in seconds to wait for
+        timeout (float, optional): The maximum time in seconds to wait for
             any object to become available.
-            Defaults to squish.testSettings.waitForObjectTimeout/1000.
+            Defaults to squish.testSettings.waitForObjectTimeout/1000
+            read at the time of the call.
         retry_delay (float, optional): The time in seconds to wait before
             retrying the Squish lookup function. Defaults to 0.5.
 
@@ -31,6 +31,14 @@ class LogLevel:
     }
 
 
+# Module-level aliases of the log levels, e.g. report.set_level(report.DEBUG)
+DEBUG = LogLevel.DEBUG
+LOG = LogLevel.LOG
+WARNING = LogLevel.WARNING
+FAIL = LogLevel.FAIL
+FATAL = LogLevel.FATAL
+
+
 def __translate_Level(level) -> int:
     """Translates the given log level to valid LogLevel
 
@@ -40,9 +48,10 @@ def __translate_Level(level) -> int:
     if isinstance(level, int):
         rv = level
     elif isinstance(level, str):
-        if level not in LogLevel._nameToLevel:
-            raise ValueError(f"Unknown LogLevel: {level}")
-        rv = LogLevel._nameToLevel[level]
+        try:
+            rv = LogLevel._nameToLevel[level]
+        except KeyError:
+            raise ValueError(f"Unknown LogLevel: {level}") from None
     else:
         raise TypeError(f"LogLevel is not an integer or a valid string: {level}")
     return rv
@@ -56,6 +65,7 @@ def set_level(level) -> None:
 
     Examples:
        >>> set_level(report.LogLevel.WARNING)
+       >>> set_level(report.WARNING)
        >>> set_level("FAIL")
     """
     global LOGLEVEL
@@ -68,18 +78,60 @@ _test_log = test.log
 _test_warning = test.warning
 _test_fail = test.fail
 _test_fatal = test.fatal
+_test_fixate_result_context = test.fixateResultContext
+_test_restore_result_context = test.restoreResultContext
+_test_start_section = test.startSection
+_test_end_section = test.endSection
+
+_DEBUG_PREFIX = "[DEBUG] "
 
 
-def __is_level_enabled(level: LogLevel) -> bool:
-    """Checks the given log level against the currently set LOGLEVEL
+def _log_at(log_function, msg, details) -> None:
+    """Adds an entry to a test report using the given 'test' module function.
+
+    The entry is reported at the location of the code that called
+    the public logging function, not at the location of this module.
 
     Args:
-        level (LogLevel): log level to check
+        log_function (callable): 'test' module function adding the entry
+        msg (str|lazy): The message to include in the entry.
+        details (str|lazy): Additional details to include in the entry.
+    """
+    _test_fixate_result_context(2)
+    try:
+        log_function(str(msg), str(details))
+    finally:
+        _test_restore_result_context()
 
-    Returns:
-        bool: True if level is equal to or higher than LOGLEVEL, False otherwise
+
+class lazy:
+    """Defers building of a log message until it is added to a test report.
+
+    Formatting a message (e.g. with an f-string) happens before the logging
+    function is even called, so a message filtered out by the current LOGLEVEL
+    still pays for it. Wrapping the expensive part in `lazy` postpones the work
+    until the message is actually logged.
     """
-    return LOGLEVEL <= level
+
+    __slots__ = ("func", "args")
+
+    def __init__(self, func, *args):
+        """
+        Args:
+            func (callable): function that produces the message
+            *args: arguments to call the function with
+
+        Examples:
+            ```python
+            debug("Found objects", lazy(object_tree.find, names.main_window))
+            debug(lazy("Found %d objects in %s".__mod__, (count, name)))
+            ```
+        """
+        self.func = func
+        self.args = args
+
+    def __str__(self):
+        return str(self.func(*self.args))
 
 
 def debug(msg: str, details: str = "") -> None:
@@ -92,20 +144,21 @@ def debug(msg: str, details: str = "") -> None:
 
     The log message will only be visible if the LOGLEVEL is set to DEBUG.
     Otherwise, it will be ignored and not included in the test report.
+    Expensive messages or details can be wrapped in `lazy`, so they are built
+    only when the entry is actually logged.
 
     Args:
-        msg (str): The message to include in the log entry.
-        details (str): Optional additional details to include in the log entry.
+        msg (str|lazy): The message to include in the log entry.
+        details (str|lazy): Optional additional details to include
+            in the log entry.
 
     Returns:
         None
     """
-    if __is_level_enabled(LogLevel.DEBUG):
-        test.fixateResultContext(1)
-        try:
-            _test_log(f"[DEBUG] {msg}", details)
-        finally:
-            test.restoreResultContext()
+    if LOGLEVEL > DEBUG:
+        return
+
+    _log_at(_test_log, _DEBUG_PREFIX + str(msg), details)
 
 
 def log(msg: str, details: str = "") -> None:
@@ -119,18 +172,17 @@ def log(msg: str, details: str = "") -> None:
     Otherwise, it will be ignored and not included in the test report.
 
     Args:
-        msg (str): The message to include in the log entry.
-        details (str): Optional additional details to include in the log entry.
+        msg (str|lazy): The message to include in the log entry.
+        details (str|lazy): Optional additional details to include
+            in the log entry.
 
     Returns:
         None
     """
-    if __is_level_enabled(LogLevel.LOG):
-        test.fixateResultContext(1)
-        try:
-            _test_log(msg, details)
-        finally:
-            test.restoreResultContext()
+    if LOGLEVEL > LOG:
+        return
+
+    _log_at(_test_log, msg, details)
 
 
 def warning(msg: str, details: str = "") -> None:
@@ -145,18 +197,17 @@ def warning(msg: str, details: str = "") -> None:
     Otherwise, it will be ignored and not included in the test report.
 
     Args:
-        msg (str): The message to include in the warning entry.
-        details (str): Optional additional details to include in the warning entry.
+        msg (str|lazy): The message to include in the warning entry.
+        details (str|lazy): Optional additional details to include
+            in the warning entry.
 
     Returns:
         None
     """
-    if __is_level_enabled(LogLevel.WARNING):
-        test.fixateResultContext(1)
-        try:
-            _test_warning(msg, details)
-        finally:
-            test.restoreResultContext()
+    if LOGLEVEL > WARNING:
+        return
+
+    _log_at(_test_warning, msg, details)
 
 
 def fail(msg: str, details: str = "") -> None:
@@ -170,18 +221,17 @@ def fail(msg: str, details: str = "") -> None:
     Otherwise, it will be ignored and not included in the test report.
 
     Args:
-        msg (str): The message to include in the fail entry.
-        details (str): Optional additional details to include in the fail entry.
+        msg (str|lazy): The message to include in the fail entry.
+        details (str|lazy): Optional additional details to include
+            in the fail entry.
 
     Returns:
         None
     """
-    if __is_level_enabled(LogLevel.FAIL):
-        test.fixateResultContext(1)
-        try:
-            _test_fail(msg, details)
-        finally:
-            test.restoreResultContext()
+    if LOGLEVEL > FAIL:
+        return
+
+    _log_at(_test_fail, msg, details)
 
 
 def fatal(msg: str, details: str = "") -> None:
@@ -198,19 +248,24 @@ def fatal(msg: str, details: str = "") -> None:
     After adding the fatal message, the function aborts the test case execution.
 
     Args:
-        msg (str): The message to include in the fatal entry.
-        details (str): Optional additional details to include in the fatal entry.
+        msg (str|lazy): The message to include in the fatal entry.
+        details (str|lazy): Optional additional details to include
+            in the fatal entry.
 
     Returns:
         None
     """
-    if __is_level_enabled(LogLevel.FATAL):
-        test.fixateResultContext(1)
-        try:
-            squish.testSettings.throwOnFailure = True
-            _test_fatal(msg, details)
-        finally:
-            test.restoreResultContext()
+    if LOGLEVEL > FATAL:
+        return
+
+    # squape.settings imports this module, so the setting is restored by hand
+    test_settings = squish.testSettings
+    throw_on_failure = test_settings.throwOnFailure
+    test_settings.throwOnFailure = True
+    try:
+        _log_at(_test_fatal, msg, details)
+    finally:
+        test_settings.throwOnFailure = throw_on_failure
 
 
 def enable_loglevel_in_test_module() -> None:
@@ -253,6 +308,8 @@ class section:
     https://doc.qt.io/squish/squish-api.html#test-startsection-function
     """
 
+    __slots__ = ("title", "description")
+
     def __init__(self, title, description=""):
         """
         Args:
@@ -274,23 +331,23 @@ class section:
 
         @functools.wraps(func)
         def wrapped(*args, **kwargs):
-            test.fixateResultContext(1)
-            test.startSection(self.title, self.description)
-            test.restoreResultContext()
+            _test_fixate_result_context(1)
+            _test_start_section(self.title, self.description)
+            _test_restore_result_context()
             try:
                 result = func(*args, **kwargs)
             finally:
-                test.endSection()
+                _test_end_section()
             return result
 
         return wrapped
 
     def __enter__(self):
         """Executed when section is used as a context manager"""
-        test.fixateResultContext(1)
-        test.startSection(self.title, self.description)
-        test.restoreResultContext()
+        _test_fixate_result_context(1)
+        _test_start_section(self.title, self.description)
+        _test_restore_result_context()
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Executed after section is used as a context manager"""
-        test.endSection()
+        _test_end_section()
@@ -4,7 +4,7 @@
 # All rights reserved.
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
-from contextlib import contextmanager
+import functools
 
 try:
     import squish
@@ -15,43 +15,107 @@ from squape.internal.exceptions import SquishCapabilityError
 from squape.report import debug
 
 
-@contextmanager
-def _ctx_settings(setting_name, value):
+class _TestSettings:
     """
-     A context manager that temporarily sets a Squish testSettings to a given value.
+    Temporarily sets Squish test settings to the given values.
 
-    Args:
-        setting_name (str): The name of the Squish testSettings to set.
-        value (Any): The value to set the Squish test setting to.
+    Can be used as a context manager or as a function decorator.
+    The previous values of the settings are restored on exit.
+    """
 
-    Raises:
-        SquishCapability: If the Squish version does not support the given test setting.
+    __slots__ = ("settings", "_previous_values")
+
+    def __init__(self, settings: dict):
+        """
+        Args:
+            settings (dict): The names of the Squish test settings to set,
+                mapped to the values to set them to.
+        """
+        self.settings = settings
+        # One snapshot per active 'with' block, so the same instance can be nested
+        self._previous_values = []
+
+    def __call__(self, func):
+        """Executed when the settings are used as a decorator"""
+
+        @functools.wraps(func)
+        def wrapped(*args, **kwargs):
+            with _TestSettings(self.settings):
+                return func(*args, **kwargs)
+
+        return wrapped
+
+    def __enter__(self):
+        """
+        Executed when the settings are used as a context manager
+
+        Raises:
+            SquishCapabilityError: If the Squish version does not support
+                one of the given test settings.
+        """
+        test_settings = squish.testSettings
+        previous_values = []
+        try:
+            for setting_name, value in self.settings.items():
+                try:
+                    current_value = getattr(test_settings, setting_name)
+                    debug(
+                        f"Setting value of '{setting_name}' setting "
+                        f"from {current_value} to {value}"
+                    )
+                    setattr(test_settings, setting_name, value)
+                except AttributeError:
+                    raise SquishCapabilityError(
+                        "Your Squish version does not support "
+                        f"test setting {setting_name}"
+                    )
+                previous_values.append((setting_name, value, current_value))
+        except BaseException:
+            _restore_settings(previous_values)
+            raise
+        self._previous_values.append(previous_values)
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Executed after the settings are used as a context manager"""
+        _restore_settings(self._previous_values.pop())
+
+
+def _restore_settings(previous_values: list) -> None:
+    """
+    Restores Squish test settings in reverse order of setting them.
 
+    Args:
+        previous_values (list): (setting name, set value, previous value) tuples.
     """
-    try:
-        current_value = getattr(squish.testSettings, setting_name)
+    test_settings = squish.testSettings
+    for setting_name, value, previous_value in reversed(previous_values):
         debug(
-            f"Setting value of '{setting_name}' setting from {current_value} to {value}"
-        )
-        setattr(squish.testSettings, setting_name, value)
-    except AttributeError:
-        raise SquishCapabilityError(
-            f"Your Squish version does not support test setting {setting_name}"
+            f"Setting value of '{setting_name}' setting "
+            f"from {value} to {previous_value}"
         )
+        setattr(test_settings, setting_name, previous_value)
 
-    try:
-        yield
-    except Exception:
-        raise
-    finally:
-        debug(
-            f"Setting value of '{setting_name}' setting from {value} to {current_value}"
-        )
-        setattr(squish.testSettings, setting_name, current_value)
 
+def settings(**test_settings):
+    """Allows using several test settings as a single context manager.
+    https://doc.qt.io/squish/squish-api.html#testsettings-object
+
+    The settings are set in the given order and restored in reverse order,
+    which is cheaper than stacking a separate context manager for each of them.
+
+    Args:
+        **test_settings: Squish test setting names mapped to the values to set.
 
-@contextmanager
-def logScreenshotOnPass(enabled: bool = True) -> None:
+    Examples:
+        ```python
+        with settings(imageSearchTolerant=True, imageSearchThreshold=95):
+            test.imagePresent("image.png")
+        ```
+    """
+    return _TestSettings(test_settings)
+
+
+def logScreenshotOnPass(enabled: bool = True):
     """Allows using logScreenshotOnPass test setting as context managers.
     https://doc.qt.io/squish/squish-api.html#bool-testsettings-logscreenshotonpass
 
@@ -65,12 +129,10 @@ def logScreenshotOnPass(enabled: bool = True) -> None:
             # code with verifications
         ```
     """
-    with _ctx_settings("logScreenshotOnPass", enabled):
-        yield
+    return _TestSettings({"logScreenshotOnPass": enabled})
 
 
-@contextmanager
-def logScreenshotOnFail(enabled: bool = True) -> None:
+def logScreenshotOnFail(enabled: bool = True):
     """Allows using logScreenshotOnFail test setting as context managers.
     https://doc.qt.io/squish/squish-api.html#bool-testsettings-logscreenshotonfail
 
@@ -84,13 +146,10 @@ def logScreenshotOnFail(enabled: bool = True) -> None:
             # code with verifications
         ```
     """
-
-    with _ctx_settings("logScreenshotOnFail", enabled):
-        yield
+    return _TestSettings({"logScreenshotOnFail": enabled})
 
 
-@contextmanager
-def logScreenshotOnWarning(enabled: bool = True) -> None:
+def logScreenshotOnWarning(enabled: bool = True):
     """Allows using logScreenshotOnWarning test setting as context managers.
     https://doc.qt.io/squish/squish-api.html#bool-testsettings-logscreenshotonwarning
 
@@ -104,12 +163,10 @@ def logScreenshotOnWarning(enabled: bool = True) -> None:
             # code where warning messages might happen
         ```
     """
-    with _ctx_settings("logScreenshotOnWarning", enabled):
-        yield
+    return _TestSettings({"logScreenshotOnWarning": enabled})
 
 
-@contextmanager
-def silentVerifications(enabled: bool = True) -> None:
+def silentVerifications(enabled: bool = True):
     """Allows using silentVerifications test setting as context managers.
     https://doc.qt.io/squish/squish-api.html#bool-testsettings-silentverifications
 
@@ -122,12 +179,10 @@ def silentVerifications(enabled: bool = True) -> None:
             # code with test.vp statements
         ```
     """
-    with _ctx_settings("silentVerifications", enabled):
-        yield
+    return _TestSettings({"silentVerifications": enabled})
 
 
-@contextmanager
-def imageSearchTolerant(enabled: bool = True) -> None:
+def imageSearchTolerant(enabled: bool = True):
     """Allows using imageSearchTolerant test setting as context managers.
     https://doc.qt.io/squish/squish-api.html#bool-testsettings-imagesearchtolerant
 
@@ -141,12 +196,10 @@ def imageSearchTolerant(enabled: bool = True) -> None:
             test.imagePresent()
         ```
     """
-    with _ctx_settings("imageSearchTolerant", enabled):
-        yield
+    return _TestSettings({"imageSearchTolerant": enabled})
 
 
-@contextmanager
-def imageSearchThreshold(threshold: float) -> None:
+def imageSearchThreshold(threshold: float):
     """Allows using imageSearchThreshold test setting as context managers.
     https://doc.qt.io/squish/squish-api.html#number-testsettings-imagesearchthreshold
 
@@ -159,12 +212,10 @@ def imageSearchThreshold(threshold: float) -> None:
             test.imagePresent("image.png")
         ```
     """
-    with _ctx_settings("imageSearchThreshold", threshold):
-        yield
+    return _TestSettings({"imageSearchThreshold": threshold})
 
 
-@contextmanager
-def imageSearchMultiscale(enabled: bool = True) -> None:
+def imageSearchMultiscale(enabled: bool = True):
     """Allows using imageSearchMultiscale test setting as context managers.
     https://doc.qt.io/squish/squish-api.html#bool-testsettings-imagesearchmultiscale
 
@@ -178,12 +229,10 @@ def imageSearchMultiscale(enabled: bool = True) -> None:
             test.imagePresent("image2.png")
         ```
     """
-    with _ctx_settings("imageSearchMultiscale", enabled):
-        yield
+    return _TestSettings({"imageSearchMultiscale": enabled})
 
 
-@contextmanager
-def imageSearchMinScale(min_scale: float) -> None:
+def imageSearchMinScale(min_scale: float):
     """Allows using imageSearchMinScale test setting as context managers.
     https://doc.qt.io/squish/squish-api.html#number-testsettings-imagesearchminscale
 
@@ -197,12 +246,10 @@ def imageSearchMinScale(min_scale: float) -> None:
             test.imagePresent("image2.png")
         ```
     """
-    with _ctx_settings("imageSearchMinScale", min_scale):
-        yield
+    return _TestSettings({"imageSearchMinScale": min_scale})
 
 
-@contextmanager
-def imageSearchMaxScale(max_scale: float) -> None:
+def imageSearchMaxScale(max_scale: float):
     """Allows using imageSearchMaxScale test setting as context managers.
     https://doc.qt.io/squish/squish-api.html#number-testsettings-imagesearchmaxscale
 
@@ -216,12 +263,10 @@ def imageSearchMaxScale(max_scale: float) -> None:
             test.imagePresent("image2.png")
         ```
     """
-    with _ctx_settings("imageSearchMaxScale", max_scale):
-        yield
+    return _TestSettings({"imageSearchMaxScale": max_scale})
 
 
-@contextmanager
-def waitForObjectTimeout(timeout_ms: int) -> None:
+def waitForObjectTimeout(timeout_ms: int):
     """Allows using waitForObjectTimeout test setting as context managers.
     https://doc.qt.io/squish/squish-api.html#integer-testsettings-waitforobjecttimeout
 
@@ -235,12 +280,10 @@ def waitForObjectTimeout(timeout_ms: int) -> None:
             waitForObject(names.obj2)
         ```
     """
-    with _ctx_settings("waitForObjectTimeout", timeout_ms):
-        yield
+    return _TestSettings({"waitForObjectTimeout": timeout_ms})
 
 
-@contextmanager
-def objectNotFoundDebugging(enabled: bool) -> None:
+def objectNotFoundDebugging(enabled: bool):
     """Allows using objectNotFoundDebugging test setting as context managers.
     https://doc.qt.io/squish/squish-api.html#bool-testsettings-objectnotfounddebugging
 
@@ -254,12 +297,10 @@ def objectNotFoundDebugging(enabled: bool) -> None:
             waitForObject(names.obj2)
         ```
     """
-    with _ctx_settings("objectNotFoundDebugging", enabled):
-        yield
+    return _TestSettings({"objectNotFoundDebugging": enabled})
 
 
-@contextmanager
-def imageNotFoundDebugging(enabled: bool) -> None:
+def imageNotFoundDebugging(enabled: bool):
     """Allows using imageNotFoundDebugging test setting as context managers.
     https://doc.qt.io/squish/squish-api.html#bool-testsettings-imagenotfounddebugging
 
@@ -273,12 +314,10 @@ def imageNotFoundDebugging(enabled: bool) -> None:
             waitForImage("image2.png")
         ```
     """
-    with _ctx_settings("imageNotFoundDebugging", enabled):
-        yield
+    return _TestSettings({"imageNotFoundDebugging": enabled})
 
 
-@contextmanager
-def textNotFoundDebugging(enabled: bool) -> None:
+def textNotFoundDebugging(enabled: bool):
     """Allows using textNotFoundDebugging test setting as context managers.
     https://doc.qt.io/squish/squish-api.html#bool-testsettings-textnotfounddebugging
 
@@ -292,12 +331,10 @@ def textNotFoundDebugging(enabled: bool) -> None:
             waitForOcrText("Alpaca")
         ```
     """
-    with _ctx_settings("textNotFoundDebugging", enabled):
-        yield
+    return _TestSettings({"textNotFoundDebugging": enabled})
 
 
-@contextmanager
-def defaultOcrLanguage(language: str) -> None:
+def defaultOcrLanguage(language: str):
     """Allows using defaultOcrLanguage test setting as context managers.
     https://doc.qt.io/squish/squish-api.html#bool-testsettings-defaultocrlanguage
 
@@ -312,12 +349,10 @@ def defaultOcrLanguage(language: str) -> None:
             waitForOcrText("Miasto")
         ```
     """
-    with _ctx_settings("defaultOcrLanguage", language):
-        yield
+    return _TestSettings({"defaultOcrLanguage": language})
 
 
-@contextmanager
-def breakOnFailure(enabled: bool = True) -> None:
+def breakOnFailure(enabled: bool = True):
     """Allows using breakOnFailure test setting as context managers.
     https://doc.qt.io/squish/squish-api.html#bool-testsettings-breakonfailure
 
@@ -331,12 +366,10 @@ def breakOnFailure(enabled: bool = True) -> None:
             # code with verifications
         ```
     """
-    with _ctx_settings("breakOnFailure", enabled):
-        yield
+    return _TestSettings({"breakOnFailure": enabled})
 
 
-@contextmanager
-def throwOnFailure(enabled: bool) -> None:
+def throwOnFailure(enabled: bool):
     """Allows using throwOnFailure test setting as context managers.
     https://doc.qt.io/squish/squish-api.html#bool-testsettings-throwonfailure
 
@@ -350,12 +383,10 @@ def throwOnFailure(enabled: bool) -> None:
             # code with verifications
         ```
     """
-    with _ctx_settings("throwOnFailure", enabled):
-        yield
+    return _TestSettings({"throwOnFailure": enabled})
 
 
-@contextmanager
-def retryDuration(duration_ms: int) -> None:
+def retryDuration(duration_ms: int):
     """Allows using retryDuration test setting as context managers.
     https://doc.qt.io/squish/squish-api.html#integer-testsettings-retryduration
 
@@ -369,5 +400,4 @@ def retryDuration(duration_ms: int) -> None:
             test.vp("VP1")
         ```
     """
-    with _ctx_settings("retryDuration", duration_ms):
-        yield
+    return _TestSettings({"retryDuration": duration_ms})
@@ -1,5 +1,10 @@
 # -*- coding: utf-8 -*-
+import functools
 import os
+import re
+import shlex
+from contextlib import contextmanager
+from itertools import groupby
 from pathlib import Path
 from typing import List
 
@@ -12,7 +17,26 @@ from remotesystem import RemoteSystem
 
 from squape.internal.exceptions import EnvironmentError
 from squape.internal.exceptions import SquishserverError
-from squape.report import debug, log
+from squape.report import debug, log, warning
+
+# Host and port of the squishserver the squishrunner was started with
+_DEFAULT_HOST = os.environ.get("SQUISHRUNNER_HOST", "127.0.0.1")
+# The port is parsed when it is used, so a malformed value does not break the import
+_DEFAULT_PORT = os.environ.get("SQUISHRUNNER_PORT", "4322")
+
+# Command prefix shared by all squishserver configuration calls
+_CONFIG_COMMAND = ("squishserver", "--config")
+# Printed before every step of a bulk configuration to find the failing one
+_BULK_STEP_MARKER = "squape-bulk-config-step-"
+# Configuration operations that undo each other, used to roll back bulk configuration
+_INVERSE_CONFIG_OPTIONS = {
+    "addAUT": "removeAUT",
+    "removeAUT": "addAUT",
+    "addAppPath": "removeAppPath",
+    "removeAppPath": "addAppPath",
+    "addAttachableAUT": "removeAttachableAUT",
+    "removeAttachableAUT": "addAttachableAUT",
+}
 
 
 class SquishServer:
@@ -37,18 +61,11 @@ class SquishServer:
                 If "--port" was not set, the default value "4322" will be used.
         """
 
-        if host is None:
-            self._host = os.environ.get("SQUISHRUNNER_HOST", "127.0.0.1")
-        else:
-            self._host = host
+        self._host = _DEFAULT_HOST if host is None else host
+        self._port = int(_DEFAULT_PORT) if port is None else port
 
-        if port is None:
-            if "SQUISHRUNNER_PORT" in os.environ:
-                self._port = int(os.environ["SQUISHRUNNER_PORT"])
-            else:
-                self._port = 4322
-        else:
-            self._port = port
+        # Prepended to every report message of this squishserver
+        self._log_prefix = f"[Squishserver {self.host}:{self.port}] "
 
         try:
             self._remotesys = RemoteSystem(self.host, self.port)
@@ -57,17 +74,11 @@ class SquishServer:
                 f"Unable to connect to squishserver ({self.host}:{self.port})"
             )
 
-        if location is None:
-            try:
-                self._location = self.remotesys.getEnvironmentVariable("SQUISH_PREFIX")
-            except KeyError:
-                raise EnvironmentError(
-                    "The SQUISH_PREFIX environment variable is not set, "
-                    "and location of the squishserver "
-                    f"({self.host}:{self.port}) is not specified!"
-                )
-        else:
-            self._location = location
+        # Resolved from the squishserver process on first use, if not given
+        self._location = location
+
+        # Queue of configuration commands while inside bulk_config()
+        self._pending_config = None
 
     @property
     def host(self) -> str:
@@ -81,7 +92,22 @@ class SquishServer:
 
     @property
     def location(self) -> str:
-        """The location of the Squish package."""
+        """The location of the Squish package.
+
+        Raises:
+            EnvironmentError: If the location was not specified and
+                the SQUISH_PREFIX environment variable of the squishserver
+                process is not set.
+        """
+        if self._location is None:
+            try:
+                self._location = self.remotesys.getEnvironmentVariable("SQUISH_PREFIX")
+            except KeyError:
+                raise EnvironmentError(
+                    "The SQUISH_PREFIX environment variable is not set, "
+                    "and location of the squishserver "
+                    f"({self.host}:{self.port}) is not specified!"
+                )
         return self._location
 
     @property
@@ -89,7 +115,7 @@ class SquishServer:
         """RemoteSystem of the squishserver."""
         return self._remotesys
 
-    @property
+    @functools.cached_property
     def os_name(self) -> str:
         """Name of the Operating System where the squishserver is running."""
         return self.remotesys.getOSName()
@@ -106,27 +132,196 @@ class SquishServer:
         """
         if params is None:
             params = []
-        cmd = ["squishserver", "--config", config_option, *params]
+        cmd = [*_CONFIG_COMMAND, config_option, *params]
         if cwd is None:
             cwd = self.location
 
+        if self._pending_config is not None:
+            self._pending_config.append((cwd, config_option, params, cmd))
+            return
+
+        self._execute_config(cwd, config_option, params, cmd)
+
+    def _log_config(self, message: str) -> None:
+        """Adds a log entry about a configuration operation to a test report
+
+        Inside bulk_config() the operation is only queued, which the entry says.
+
+        Args:
+            message (str): description of the configuration operation.
+        """
+        if self._pending_config is not None:
+            message = f"Queued for bulk configuration: {message}"
+        log(f"{self._log_prefix}{message}")
+
+    def _execute_config(self, cwd: str, config_option: str, params: list, cmd: list):
+        """Executes a single 'squishserver --config ...' command
+
+        Args:
+            cwd (str): the path to the current working directory.
+            config_option (str): the config option used in the command.
+            params (list): the configuration parameters used in the command.
+            cmd (list): the command to execute.
+        """
         debug(
-            f"[Squishserver {self.host}:{self.port}] "
-            f"Executing command: {' '.join(cmd)}",
+            f"{self._log_prefix}Executing command: {' '.join(cmd)}",
             f"cwd: {cwd}",
         )
-        (exitcode, stdout, stderr) = self.remotesys.execute(cmd, cwd)
-        if exitcode != "0":
-            raise SquishserverError(
-                f"[Squishserver {self.host}:{self.port}] "
-                "was not able to perform "
+        result = self.remotesys.execute(cmd, cwd)
+        if _config_failed(result[0]):
+            self._raise_config_error(
+                result,
                 f"{config_option} configuration operation"
-                f"\nParameters: {' '.join(params)}"
-                f"\nexit code: {exitcode}"
-                f"\nstdout: {stdout}"
-                f"\nstderr: {stderr}"
+                f"\nParameters: {' '.join(params)}",
             )
 
+    def _raise_config_error(self, result, operation: str) -> None:
+        """Raises an error for a failed squishserver configuration command
+
+        Args:
+            result (list): exitcode, stdout and stderr of the executed command.
+            operation (str): description of the performed configuration operation.
+
+        Raises:
+            SquishserverError: always.
+        """
+        (exitcode, stdout, stderr) = result
+        raise SquishserverError(
+            f"{self._log_prefix}was not able to perform {operation}"
+            f"\nexit code: {exitcode}"
+            f"\nstdout: {stdout}"
+            f"\nstderr: {stderr}"
+        )
+
+    @contextmanager
+    def bulk_config(self, rollback: bool = False):
+        """Groups squishserver configuration operations into a single remote call
+
+        Configuration operations (e.g. addAUT, addAppPath) called inside
+        the context are queued and executed when the context exits,
+        chained in one shell command instead of one remote call per operation.
+        The chain stops at the first failing operation.
+
+        On Windows, the queued operations are executed one by one,
+        because cmd.exe would interpret characters like & or % in the parameters.
+
+        If an exception is raised inside the context, the queued operations
+        are discarded without being executed and the exception is propagated.
+        The log entries of the configuration methods called inside the context
+        say that the operation was queued; one more entry is logged
+        when all of them have been executed.
+
+        !!! warning
+            Rollback undoes every operation that succeeded before the failing one,
+            whether or not it changed the configuration. For example, addAUT
+            succeeds also for an AUT that is already registered, so rolling it back
+            removes a registration that existed before the bulk configuration.
+            Use rollback only for entries the bulk configuration itself introduces.
+
+        Args:
+            rollback (bool, optional): If True and a queued operation fails,
+                the operations that succeeded before it are undone in reverse order
+                (e.g. removeAUT for addAUT) before the error is raised.
+                It does not apply to exceptions raised inside the context,
+                as nothing is executed then. Defaults to False.
+
+        Raises:
+            SquishserverError: if any of the queued operations fails.
+                If the rollback fails as well, it is reported as a warning
+                and the error of the failed operation is raised.
+
+        Examples:
+            ```python
+            with squishserver.bulk_config():
+                squishserver.addAppPath(app_dir)
+                squishserver.addAUT("addressbook", app_dir)
+                squishserver.addAUT("calculator", app_dir)
+            ```
+        """
+        if self._pending_config is not None:
+            # Nested bulk configuration joins the already open queue
+            # and the rollback setting of the outermost one
+            yield
+            return
+
+        self._pending_config = []
+        try:
+            yield
+        finally:
+            pending_config = self._pending_config
+            self._pending_config = None
+
+        # Reached only when the context exits without an exception
+        executed = []
+        try:
+            if self.os_name == "Windows":
+                for operation in pending_config:
+                    self._execute_config(*operation)
+                    executed.append(operation)
+            else:
+                for cwd, operations in groupby(pending_config, key=lambda op: op[0]):
+                    self._execute_config_chain(cwd, list(operations), executed)
+            if pending_config:
+                log(
+                    f"{self._log_prefix}Executed {len(pending_config)} "
+                    "queued configuration operations"
+                )
+        except SquishserverError:
+            if rollback:
+                try:
+                    self._rollback_config(executed)
+                except SquishserverError as rollback_error:
+                    # The failed operation is the error to report, not the rollback
+                    warning(
+                        f"{self._log_prefix}Rollback of the bulk configuration failed",
+                        str(rollback_error),
+                    )
+            raise
+
+    def _execute_config_chain(self, cwd: str, operations: list, executed: list):
+        """Executes configuration commands chained in one POSIX shell command
+
+        Args:
+            cwd (str): the path to the current working directory.
+            operations (list): (cwd, config option, parameters, command) tuples
+                to execute.
+            executed (list): the list the succeeded operations are appended to.
+        """
+        script = " && ".join(
+            f"echo {_BULK_STEP_MARKER}{step} && {shlex.join(cmd)}"
+            for step, (_, _, _, cmd) in enumerate(operations, start=1)
+        )
+        debug(f"{self._log_prefix}Executing command: {script}", f"cwd: {cwd}")
+        result = self.remotesys.execute(["sh", "-c", script], cwd)
+        if _config_failed(result[0]):
+            step = _last_bulk_step(result[1])
+            executed.extend(operations[: max(step - 1, 0)])
+            self._raise_config_error(result, _failed_bulk_operation(operations, step))
+        executed.extend(operations)
+
+    def _rollback_config(self, operations: list) -> None:
+        """Undoes the given configuration operations in reverse order
+
+        squishserver does not report whether an operation changed
+        the configuration, so the inverse of every given operation is executed.
+
+        Args:
+            operations (list): (cwd, config option, parameters, command) tuples
+                of the succeeded operations.
+        """
+        if not operations:
+            return
+
+        warning(
+            f"{self._log_prefix}Rolling back {len(operations)} "
+            "configuration operations"
+        )
+        with self.bulk_config():
+            for cwd, config_option, params, _ in reversed(operations):
+                self._config_squishserver(
+                    _INVERSE_CONFIG_OPTIONS[config_option], params, cwd
+                )
+
     def addAUT(self, aut: str, path: str) -> None:
         """Register an AUT
 
@@ -134,10 +329,7 @@ class SquishServer:
             aut (str): the name of the executable
             path (str): path to the executable folder
         """
-        log(
-            f"[Squishserver {self.host}:{self.port}] "
-            f"Registering {Path(path)/aut} AUT"
-        )
+        self._log_config(f"Registering {Path(path)/aut} AUT")
         self._config_squishserver("addAUT", [aut, path])
 
     def removeAUT(self, aut: str, path: str) -> None:
@@ -147,10 +339,7 @@ class SquishServer:
             aut (str): the name of the executable
             path (str): path to the executable folder
         """
-        log(
-            f"[Squishserver {self.host}:{self.port}] "
-            f"Removing registered {Path(path)/aut} AUT"
-        )
+        self._log_config(f"Removing registered {Path(path)/aut} AUT")
         self._config_squishserver("removeAUT", [aut, path])
 
     def addAppPath(self, path: str) -> None:
@@ -159,7 +348,7 @@ class SquishServer:
         Args:
             path (str): the AUT path to register
         """
-        log(f"[Squishserver {self.host}:{self.port}] " f"Registering AUT path: {path}")
+        self._log_config(f"Registering AUT path: {path}")
         self._config_squishserver("addAppPath", [path])
 
     def removeAppPath(self, path: str) -> None:
@@ -168,10 +357,7 @@ class SquishServer:
         Args:
             path (str): the path to the AUT
         """
-        log(
-            f"[Squishserver {self.host}:{self.port}] "
-            f"Removing registered AUT path: {path}"
-        )
+        self._log_config(f"Removing registered AUT path: {path}")
         self._config_squishserver("removeAppPath", [path])
 
     def addAttachableAut(self, aut: str, port: int, host: str = "127.0.0.1") -> None:
@@ -185,10 +371,7 @@ class SquishServer:
                                     is supposed to be running.
                                     Defaults to "127.0.0.1".
         """
-        log(
-            f"[Squishserver {self.host}:{self.port}] "
-            f"Registering an attachable AUT {aut}"
-        )
+        self._log_config(f"Registering an attachable AUT {aut}")
         self._config_squishserver("addAttachableAUT", [aut, f"{host}:{port}"])
 
     def removeAttachableAut(self, aut: str, port: int, host: str = "127.0.0.1") -> None:
@@ -202,10 +385,7 @@ class SquishServer:
                                     is supposed to be running.
                                     Defaults to "127.0.0.1".
         """
-        log(
-            f"[Squishserver {self.host}:{self.port}] "
-            f"Removing registered attachable AUT {aut}"
-        )
+        self._log_config(f"Removing registered attachable AUT {aut}")
         self._config_squishserver("removeAttachableAUT", [aut, f"{host}:{port}"])
 
     def attachToApplication(self, aut: str):
@@ -218,7 +398,7 @@ class SquishServer:
         Returns:
             (ApplicationContext): application context
         """
-        log(f"[Squishserver {self.host}:{self.port}] " f"Attach to application {aut}")
+        log(f"{self._log_prefix}Attach to application {aut}")
         ctx = squish.attachToApplication(aut, self.host, self.port)
         return ctx
 
@@ -232,7 +412,7 @@ class SquishServer:
         Returns:
             (ApplicationContext): application context
         """
-        log(f"[Squishserver {self.host}:{self.port}] " f"Start an application {aut}")
+        log(f"{self._log_prefix}Start an application {aut}")
         ctx = squish.startApplication(aut, self.host, self.port)
         return ctx
 
@@ -275,5 +455,61 @@ class SquishServer:
         if self.os_name == "Windows":
             cmd = ["cmd.exe", "/s", "/c", "start", "", "/min", command, *options]
         else:
-            cmd = ["sh", "-c", f"{command} {' '.join(options)} >/dev/null 2>&1 &"]
+            if options:
+                command = f"{command} {' '.join(options)}"
+            cmd = ["sh", "-c", f"{command} >/dev/null 2>&1 &"]
         self.remotesys.execute(cmd)
+
+
+def _config_failed(exitcode) -> bool:
+    """Checks whether a squishserver configuration command failed
+
+    Args:
+        exitcode (str): the exit code returned by RemoteSystem.execute.
+
+    Returns:
+        True if the exit code is non-zero or not a number at all,
+        e.g. after a RemoteSystem transport error. False otherwise.
+    """
+    try:
+        return int(exitcode) != 0
+    except (TypeError, ValueError):
+        return True
+
+
+def _failed_bulk_operation(operations: list, step: int) -> str:
+    """Describes the bulk configuration operation that failed
+
+    Args:
+        operations (list): (cwd, config option, parameters, command) tuples
+            executed in the bulk configuration.
+        step (int): the number of the failed step, 0 if it is not known.
+
+    Returns:
+        The description of the failed operation.
+    """
+    if not step:
+        config_options = ", ".join(
+            config_option for _, config_option, _, _ in operations
+        )
+        return f"{config_options} configuration operations"
+
+    _, config_option, params, _ = operations[step - 1]
+    return (
+        f"{config_option} configuration operation "
+        f"(step {step} of {len(operations)})"
+        f"\nParameters: {' '.join(params)}"
+    )
+
+
+def _last_bulk_step(stdout: str) -> int:
+    """Finds the last started step of a bulk configuration command
+
+    Args:
+        stdout (str): the standard output of the bulk configuration command.
+
+    Returns:
+        The number of the last started step, 0 if no step was started.
+    """
+    steps = re.findall(rf"{_BULK_STEP_MARKER}(\d+)", stdout)
+    return int(steps[-1]) if steps else 0
@@ -5,7 +5,6 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 import os
-import shutil
 from contextlib import contextmanager
 from importlib import resources
 from pathlib import Path
@@ -13,6 +12,9 @@ from pathlib import Path
 import squishinfo
 import test
 
+# File extensions of videos captured by Squish
+_VIDEO_EXTS = (".mp4",)
+
 
 def _failure_results_count() -> int:
     """
@@ -30,30 +32,41 @@ def _failure_results_count() -> int:
     )
 
 
-def _videos_set() -> set:
+def _video_dir() -> str:
     """
-    This function returns a set of existing video filenames in video directory
+    This function returns the video directory of the current test case
     RESULT_DIR/TEST_SUITE_NAME/TEST_CASE_NAME/attachments.
 
     Returns:
-        The set of filenames with mp4 extension
+        The path to the video directory
     """
-    video_dir = os.path.join(
+    return os.path.join(
         squishinfo.resultDir,
         squishinfo.testSuiteName,
         squishinfo.testCaseName,
         "attachments",
     )
 
-    videos_set = set()
+
+def _videos_set() -> set:
+    """
+    This function returns a set of existing video filenames in video directory
+    RESULT_DIR/TEST_SUITE_NAME/TEST_CASE_NAME/attachments.
+
+    Returns:
+        The set of filenames with mp4 extension
+    """
+    video_dir = _video_dir()
 
     if not os.path.exists(video_dir):
-        return videos_set
+        return set()
 
-    for file in os.listdir(video_dir):
-        if file.endswith(".mp4"):
-            videos_set.add(file)
-    return videos_set
+    with os.scandir(video_dir) as entries:
+        return {
+            entry.name
+            for entry in entries
+            if entry.name.endswith(_VIDEO_EXTS) and entry.is_file(follow_symlinks=False)
+        }
 
 
 def _replace_videos(videos: set) -> None:
@@ -69,20 +82,14 @@ def _replace_videos(videos: set) -> None:
     if not len(videos):
         return None
 
-    video_dir = os.path.join(
-        squishinfo.resultDir,
-        squishinfo.testSuiteName,
-        squishinfo.testCaseName,
-        "attachments",
-    )
+    video_dir = _video_dir()
 
     res_container = Path(resources.files(__package__), Path("resources"))
-    empty_video = Path(res_container, "empty_video_with_message.mp4")
+    empty_video = Path(res_container, "empty_video_with_message.mp4").read_bytes()
 
     for video_name in videos:
         test.log(f"Remove video: {video_name}")
-        orig_video = Path(video_dir, video_name)
-        shutil.copy(empty_video, orig_video)
+        Path(video_dir, video_name).write_bytes(empty_video)
 
 
 @contextmanager
@@ -117,8 +124,6 @@ def video_capture(message: str = "", remove_on_success: bool = False) -> None:
 
     try:
         yield
-    except Exception:
-        raise
     finally:
         test.stopVideoCapture(message)
 
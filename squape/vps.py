@@ -16,7 +16,11 @@ import test
 
 
 def vph_property(
-    object_or_name: any, property_name: str, expected_value: any, msg: str
+    object_or_name: any,
+    property_name: str,
+    expected_value: any,
+    msg: str,
+    highlight: bool = True,
 ) -> bool:
     """Highlights the object then verifies its property.
     The object remains highlighted during verification to make it easier to identify
@@ -27,6 +31,8 @@ def vph_property(
         property_name (str): name of the property to verify
         expected_value (any): expected value of the verified property
         msg (str): verification message
+        highlight (bool): Whether to highlight the object. Disabling it skips
+            the highlight delay, e.g. in unattended runs. Defaulting to True.
 
     Returns:
         True if verification is positive, False otherwise
@@ -34,6 +40,9 @@ def vph_property(
 
     obj = squish.waitForObjectExists(object_or_name)
     property_value = operator.attrgetter(property_name)(obj)
+    if not highlight:
+        return test.compare(property_value, expected_value, msg)
+
     squish.highlightObject(obj, 200, False)
     result = test.compare(property_value, expected_value, msg)
     time.sleep(0.200)